@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+import json
+import os
+import re
+import zlib
+from dataclasses import dataclass
+from typing import List, Optional
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+DEFAULT_SENDER = os.getenv("GMAIL_SENDER", "enzo.ip.98@gmail.com")
+DEFAULT_TOKEN = os.getenv("GMAIL_TOKEN_PATH", "utils/token.json")
+MAILBOXES_PATH = os.getenv("GMAIL_MAILBOXES", "utils/mailboxes.json")
+CHECKPOINT_DIR = os.getenv("CHECKPOINT_DIR", "utils/checkpoints")
+
+# Destinatarios del resumen de gerencia (separados por coma)
+DIGEST_RECIPIENTS = [
+    r.strip() for r in os.getenv("DIGEST_RECIPIENTS", DEFAULT_SENDER).split(",") if r.strip()
+]
+
+
+@dataclass(frozen=True)
+class Mailbox:
+    address: str
+    token: str
+    max_per_sec: Optional[float] = None  # llamadas a Gmail por segundo (None = sin límite)
+
+    @property
+    def checkpoint_path(self) -> str:
+        slug = re.sub(r"[^A-Za-z0-9_.-]", "_", self.address)
+        return os.path.join(CHECKPOINT_DIR, f"{slug}.json")
+
+
+@dataclass(frozen=True)
+class Shard:
+    """Porción de empleados atendida por un buzón. Un shard = un proceso worker."""
+    index: int
+    count: int
+    mailbox: Mailbox
+
+    def owns(self, employee_id) -> bool:
+        return shard_index(employee_id, self.count) == self.index
+
+
+def shard_index(employee_id, count: int) -> int:
+    """
+    Asignación estable empleado -> buzón (crc32 del id). Cambiar la cantidad de buzones
+    re-asigna empleados: hacerlo fuera del ciclo del día para no cortar hilos abiertos.
+    """
+    return zlib.crc32(str(employee_id).encode()) % count
+
+
+def load_mailboxes(path: Optional[str] = None) -> List[Mailbox]:
+    """
+    Lee los buzones de `path` (JSON: [{"address", "token", "max_per_sec"?}, ...]).
+    Si no existe, hay un único buzón: GMAIL_SENDER + GMAIL_TOKEN_PATH.
+    """
+    path = path or MAILBOXES_PATH
+    if not os.path.exists(path):
+        return [Mailbox(DEFAULT_SENDER, DEFAULT_TOKEN)]
+    with open(path, encoding="utf-8") as f:
+        rows = json.load(f)
+    if not rows:
+        raise RuntimeError(f"{path} no define ningún buzón.")
+    return [Mailbox(r["address"], r["token"], r.get("max_per_sec")) for r in rows]
+
+
+def load_shards(path: Optional[str] = None) -> List[Shard]:
+    mailboxes = load_mailboxes(path)
+    return [Shard(i, len(mailboxes), mb) for i, mb in enumerate(mailboxes)]
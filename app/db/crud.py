@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 from typing import Iterable, Optional, List, Dict, Any, Tuple
-from datetime import date
+from datetime import date, datetime, timezone
 
 # --------------------------
 # Employees
@@ -126,7 +126,7 @@ def get_pending_checkins(client) -> List[Checkin]:
     today = date.today()
     res = (
         client.table("checkins")
-        .select("id,thread_id,date,employee:employee_id(name,email,active)")
+        .select("id,thread_id,date,employee_id,employee:employee_id(name,email,active)")
         .eq("date", str(today))
         .eq("employee.active", True)
         .is_("reply_received_at", "null")
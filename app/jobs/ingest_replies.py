@@ -3,18 +3,22 @@ import argparse, base64
 from datetime import date
 from typing import Optional, Dict
 
+from app.config import Shard
 from app.db.base import get_db
 from app.db.crud import (
     get_today_checkins_by_thread,
     replace_tasks,
     mark_replied
 )
-from app.services.gmail_client import list_messages, get_message
+from app.jobs.sharding import load_checkpoint, print_report, raise_on_failure, run_sharded, save_checkpoint
+from app.services.gmail_client import iter_messages, get_message
 from app.services.extractor_ai import extract_structured
 from dotenv import load_dotenv
 
 load_dotenv()
 
+MAX_PER_RUN = 50  # mensajes nuevos a procesar por corrida y por buzón
+
 
 def _decode_text(full_msg: Dict) -> Optional[str]:
     payload = full_msg.get("payload", {})
@@ -55,62 +59,83 @@ def _get_employee_name(db, employee_id: str) -> str:
     return (row.get("name") or "").strip() or row.get("email") or str(employee_id)
 
 
-def run(the_date: date, persist: bool):
-    # 1) buscar respuestas del día (ajusta el query si cambiaste el subject)
+def run_shard(shard: Shard, the_date: date, persist: bool) -> Dict[str, int]:
+    # 1) buscar respuestas del día en el buzón de este shard (ajusta el query si cambiaste el subject)
     q = f'subject:"[Seguimiento diario] {the_date:%Y-%m-%d}" newer_than:2d to:me in:inbox'
-    msgs = list_messages(q, max_results=50)
-    print(f"Mensajes candidatos: {len(msgs)}")
+    seen = load_checkpoint(shard, the_date)
+    # El checkpoint guía el listado: se pagina hasta juntar MAX_PER_RUN ids no vistos
+    msgs = []
+    for m in iter_messages(q, page_size=MAX_PER_RUN):
+        if m["id"] in seen:
+            continue
+        msgs.append(m)
+        if len(msgs) >= MAX_PER_RUN:
+            break
+    print(f"Mensajes candidatos ({shard.mailbox.address}): {len(msgs)}")
   
     processed = 0
     saved = 0
 
-    with get_db() as db:
-        for m in msgs:
-            full = get_message(m["id"])
-            thread_id = full["threadId"]
-
-            # 2) Mapear thread -> checkin de HOY
-            chk = get_today_checkins_by_thread(db, thread_id)
-            if not chk:
-                continue  # no corresponde a un hilo nuestro de hoy
-
-            # 3) Decodificar texto + preparar contexto
-            body_text = _decode_text(full)
-            if not body_text:
-                continue
-            subject = _get_subject(full)
-            default_date = the_date.strftime("%Y-%m-%d")
-
-            # employees ahora es tabla aparte; resolvemos el nombre por id
-            employee_name = _get_employee_name(db, chk["employee_id"])
-
-            # 4) Ejecutar IA -> estructura validada
-            extracted = extract_structured(subject, body_text, default_date, employee_name)
-
-            # 5) Mostrar resultado
-            print("—" * 60)
-            print("Empleado:", employee_name)
-            print("Fecha:", extracted.for_date)
-            for i, t in enumerate(extracted.tasks, 1):
-                print(
-                    f"  {i}. {t.title} | {t.status} | "
-                    f"progress={t.progress} | next={t.next_steps} | blocker={t.blocker}"
-                )
-            processed += 1
-            print(extracted.tasks)
-            # 6) Persistencia (opcional)
-            if persist:
-                # checkin_id ahora es string (ligado a threadId según tu flujo)
-                replace_tasks(
-                    db,
-                    checkin_id=chk["id"],
-                    tasks=[t.model_dump(exclude_none=True) for t in extracted.tasks]
-                )
-                mark_replied(db, chk["id"])
-                saved += 1
-
-    print("—" * 60)
-    print(f"Procesados: {processed} | Guardados: {saved} (persist={persist})")
+    try:
+        with get_db() as db:
+            for m in msgs:
+                full = get_message(m["id"])
+                thread_id = full["threadId"]
+
+                # 2) Mapear thread -> checkin de HOY
+                chk = get_today_checkins_by_thread(db, thread_id)
+                if not chk:
+                    seen.add(m["id"])
+                    continue  # no corresponde a un hilo nuestro de hoy
+
+                # 3) Decodificar texto + preparar contexto
+                body_text = _decode_text(full)
+                if not body_text:
+                    seen.add(m["id"])
+                    continue
+                subject = _get_subject(full)
+                default_date = the_date.strftime("%Y-%m-%d")
+
+                # employees ahora es tabla aparte; resolvemos el nombre por id
+                employee_name = _get_employee_name(db, chk["employee_id"])
+
+                # 4) Ejecutar IA -> estructura validada
+                extracted = extract_structured(subject, body_text, default_date, employee_name)
+
+                # 5) Mostrar resultado
+                print("—" * 60)
+                print("Empleado:", employee_name)
+                print("Fecha:", extracted.for_date)
+                for i, t in enumerate(extracted.tasks, 1):
+                    print(
+                        f"  {i}. {t.title} | {t.status} | "
+                        f"progress={t.progress} | next={t.next_steps} | blocker={t.blocker}"
+                    )
+                processed += 1
+                print(extracted.tasks)
+                # 6) Persistencia (opcional)
+                if persist:
+                    # checkin_id ahora es string (ligado a threadId según tu flujo)
+                    replace_tasks(
+                        db,
+                        checkin_id=chk["id"],
+                        tasks=[t.model_dump(exclude_none=True) for t in extracted.tasks]
+                    )
+                    mark_replied(db, chk["id"])
+                    saved += 1
+                    seen.add(m["id"])
+    finally:
+        # Guardar también si algo falla a mitad de camino: lo ya persistido no se repite
+        if persist:
+            save_checkpoint(shard, the_date, seen)
+    return {"candidates": len(msgs), "processed": processed, "saved": saved}
+
+
+def run(the_date: date, persist: bool):
+    report = run_sharded(run_shard, the_date, persist)
+    print_report(report, {"processed": "Procesados", "saved": f"Guardados (persist={persist})"})
+    raise_on_failure(report)
+    return report
 
 
 if __name__ == "__main__":
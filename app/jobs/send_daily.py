@@ -1,14 +1,17 @@
 # scripts/test_integration_send.py
 from datetime import date
+from typing import Dict
 
+from app.config import Shard
 from app.db.base import get_db
 from app.db.crud import get_employees, upsert_checkin
 
 from app.emails.templates import render_daily
+from app.jobs.sharding import print_report, raise_on_failure, run_sharded
 from app.services.gmail_client import send_email
 
 
-def main():
+def run_shard(shard: Shard) -> Dict[str, int]:
     today = date.today()
     total = 0
     ok = 0
@@ -16,9 +19,7 @@ def main():
     failed = 0
 
     with get_db() as db:
-        employees = get_employees(db, active_only=True)
-        if not employees:
-            raise RuntimeError("No hay empleados activos en la tabla employees.")
+        employees = [e for e in get_employees(db, active_only=True) if shard.owns(e["id"])]
 
         for emp in employees:
             total += 1
@@ -53,9 +54,17 @@ def main():
                 print(f"Error enviando a {emp_email}: {e!r}")
                 failed += 1
 
-    print("-" * 60)
-    print(f"Total empleados: {total} | Enviados OK: {ok} | Saltados: {skipped} | Fallidos: {failed}")
+    return {"total": total, "ok": ok, "skipped": skipped, "failed": failed}
+
+
+def main():
+    report = run_sharded(run_shard)
+    print_report(report, {"total": "Total empleados", "ok": "Enviados OK", "skipped": "Saltados", "failed": "Fallidos"})
+    raise_on_failure(report)
+    if not report.get("total"):
+        raise RuntimeError("No hay empleados activos en la tabla employees.")
+    return report
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -1,4 +1,5 @@
 from datetime import date
+from app.config import DIGEST_RECIPIENTS
 from app.db.base import get_db
 from app.db.crud import get_today_tasks
 from app.services.gmail_client import send_email
@@ -16,7 +17,7 @@ def main():
         subject = f"Resumen diario - Tareas para {today:%Y-%m-%d}"
         text_body = extract_tasks(str(tasks))
         try:
-            sent = send_email("enzo.ip.98@gmail.com", subject, text_body)
+            sent = send_email(", ".join(DIGEST_RECIPIENTS), subject, text_body)
         except:
             print(f"Error enviando reporte de gerencia")
 if __name__ == "__main__":
@@ -1,26 +1,41 @@
 from datetime import date
+from typing import Dict
 
+from app.config import Shard
 from app.db.base import get_db
 from app.db.crud import get_pending_checkins
+from app.jobs.sharding import print_report, raise_on_failure, run_sharded
 from app.services.gmail_client import send_email
 from app.emails.templates import body_reminder_text
 
-def main():
+def run_shard(shard: Shard) -> Dict[str, int]:
     today = date.today()
+    ok = 0
+    failed = 0
     with get_db() as db:
-        pending_checkins = get_pending_checkins(db)
+        # El recordatorio sale del mismo buzón que abrió el hilo (misma asignación de shard)
+        pending_checkins = [c for c in get_pending_checkins(db) if shard.owns(c["employee_id"])]
         subject = f"Recordatorio de check-in para {today:%Y-%m-%d}"
-        if not pending_checkins:
-            print("No hay check-ins pendientes para hoy.")
-            return
         for checkin in pending_checkins:
             employee = checkin["employee"]
             body = body_reminder_text(employee["name"])
             try:
                 sent = send_email(employee["email"], subject, body, thread_id=checkin["thread_id"])
                 print(f"Recordatorio enviado a {employee['email']}")
+                ok += 1
             except Exception as e:
                 print(f"Error enviando recordatorio a {employee['email']}: {e}")
+                failed += 1
+    return {"pending": len(pending_checkins), "ok": ok, "failed": failed}
+
+def main():
+    report = run_sharded(run_shard)
+    if not report.get("pending") and not report.get("failed_shards"):
+        print("No hay check-ins pendientes para hoy.")
+        return report
+    print_report(report, {"pending": "Pendientes", "ok": "Recordatorios enviados", "failed": "Fallidos"})
+    raise_on_failure(report)
+    return report
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,102 @@
+from __future__ import annotations
+
+import json
+import os
+import sys
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+from typing import Callable, Dict, List, Optional, Set
+
+from app.config import Shard, load_shards
+from app.services.gmail_client import use_mailbox
+
+
+class ShardError(RuntimeError):
+    """Uno o más shards fallaron. `report` conserva el reporte unificado (incluye los que terminaron bien)."""
+
+    def __init__(self, report: Dict):
+        super().__init__(f"{report['failed_shards']} shard(s) con error")
+        self.report = report
+
+
+def _work(fn: Callable[..., Dict[str, int]], shard: Shard, args: tuple) -> Dict:
+    # Un shard que falla no tumba a los demás: el error (con traceback) queda en su reporte
+    try:
+        use_mailbox(shard.mailbox)
+        report = dict(fn(shard, *args))
+    except Exception as e:
+        report = {"error": repr(e), "traceback": traceback.format_exc(), "failed_shards": 1}
+    report["mailbox"] = shard.mailbox.address
+    return report
+
+
+def run_sharded(fn: Callable[..., Dict[str, int]], *args, shards: Optional[List[Shard]] = None) -> Dict:
+    """
+    Corre `fn(shard, *args)` una vez por buzón, cada una en su propio proceso
+    (con un solo buzón corre en el proceso actual). `fn` debe ser una función de
+    módulo y devolver contadores; el reporte final los suma y guarda el detalle por shard.
+    Si un shard lanza una excepción, su reporte lleva `error`/`traceback` y suma a
+    `failed_shards`; el job debe llamar a raise_on_failure() después de imprimir el reporte.
+    """
+    shards = shards or load_shards()
+    if len(shards) == 1:
+        reports = [_work(fn, shards[0], args)]
+    else:
+        with ProcessPoolExecutor(max_workers=len(shards)) as ex:
+            reports = list(ex.map(_work, [fn] * len(shards), shards, [args] * len(shards)))
+    return merge_reports(reports)
+
+
+def merge_reports(reports: List[Dict]) -> Dict:
+    merged: Dict = {"shards": reports}
+    for r in reports:
+        for k, v in r.items():
+            if isinstance(v, int):
+                merged[k] = merged.get(k, 0) + v
+    return merged
+
+
+def print_report(report: Dict, labels: Dict[str, str]) -> None:
+    """Imprime la línea total y, si hubo más de un buzón, el desglose por shard."""
+    def line(r: Dict) -> str:
+        return " | ".join(f"{label}: {r.get(key, 0)}" for key, label in labels.items())
+
+    print("-" * 60)
+    print(line(report) + (f" | Shards con error: {report['failed_shards']}" if report.get("failed_shards") else ""))
+    if len(report["shards"]) > 1 or report.get("failed_shards"):
+        for r in report["shards"]:
+            print(f"  [{r['mailbox']}] " + (f"ERROR {r['error']}" if "error" in r else line(r)))
+    for r in report["shards"]:
+        if "traceback" in r:
+            print(f"[{r['mailbox']}] {r['traceback']}", file=sys.stderr)
+
+
+def raise_on_failure(report: Dict) -> None:
+    """Hace fallar el job (exit != 0 para cron) si algún shard falló."""
+    if report.get("failed_shards"):
+        raise ShardError(report)
+
+
+# --------------------------
+# Checkpoint de historial (uno por buzón)
+# --------------------------
+def load_checkpoint(shard: Shard, the_date: date) -> Set[str]:
+    """Ids de mensajes ya procesados por este buzón para `the_date`."""
+    path = shard.mailbox.checkpoint_path
+    if not os.path.exists(path):
+        return set()
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    if data.get("date") != str(the_date):
+        return set()
+    return set(data.get("seen") or [])
+
+
+def save_checkpoint(shard: Shard, the_date: date, seen: Set[str]) -> None:
+    path = shard.mailbox.checkpoint_path
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump({"date": str(the_date), "seen": sorted(seen)}, f)
+    os.replace(tmp, path)
@@ -1,3 +1,3 @@
-from .gmail_client import send_email, list_messages, get_message  # noqa: F401
+from .gmail_client import send_email, list_messages, iter_messages, get_message, use_mailbox  # noqa: F401
 from .extractor_ai import extract_structured
-__all__ = ["send_email", "list_messages", "get_message", "extract_structured"]
+__all__ = ["send_email", "list_messages", "iter_messages", "get_message", "use_mailbox", "extract_structured"]
@@ -1,19 +1,62 @@
-import os, base64
-from typing import Optional, Dict, List
+import os, base64, threading, time
+from typing import Optional, Dict, Iterator, List
 from email.message import EmailMessage
 
 from google.oauth2.credentials import Credentials
 from googleapiclient.discovery import build
 
+from app.config import Mailbox, load_mailboxes
+
 SCOPES = [
     "https://www.googleapis.com/auth/gmail.send",
     "https://www.googleapis.com/auth/gmail.modify",
 ]
 
+class _RateLimiter:
+    """
+    Token bucket simple: como mucho `per_sec` llamadas por segundo (ráfaga de 1s).
+    La capacidad es al menos 1 token para que un `per_sec` < 1 (p. ej. 0.5) no bloquee para siempre.
+    """
+
+    def __init__(self, per_sec: Optional[float]):
+        self.per_sec = per_sec
+        self._capacity = max(1.0, per_sec or 0.0)
+        self._tokens = self._capacity if per_sec else 0.0
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        if not self.per_sec:
+            return
+        with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self._capacity, self._tokens + (now - self._last) * self.per_sec)
+                self._last = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                time.sleep((1 - self._tokens) / self.per_sec)
+
+
+# Buzón activo del proceso. Cada worker de shard llama a use_mailbox() al arrancar.
+_mailbox: Mailbox = load_mailboxes()[0]
+_limiter = _RateLimiter(_mailbox.max_per_sec)
+_svc = None
+
+def use_mailbox(mailbox: Mailbox) -> None:
+    global _mailbox, _limiter, _svc
+    _mailbox = mailbox
+    _limiter = _RateLimiter(mailbox.max_per_sec)
+    _svc = None
+
 def _service():
-    # Usa el token generado por InstalledAppFlow (quickstart oficial)
-    creds = Credentials.from_authorized_user_file("utils/token.json", SCOPES)
-    return build("gmail", "v1", credentials=creds, cache_discovery=False)
+    global _svc
+    if _svc is None:
+        # Usa el token generado por InstalledAppFlow (quickstart oficial)
+        creds = Credentials.from_authorized_user_file(_mailbox.token, SCOPES)
+        _svc = build("gmail", "v1", credentials=creds, cache_discovery=False)
+    return _svc
 
 def send_email(to: str, subject: str, body: str,
                thread_id: Optional[str] = None,
@@ -21,7 +64,7 @@ def send_email(to: str, subject: str, body: str,
     svc = _service()
     msg = EmailMessage()
     msg["To"] = to
-    msg["From"] = "enzo.ip.98@gmail.com"
+    msg["From"] = _mailbox.address
     msg["Subject"] = subject
     msg.set_content(body)
 
@@ -35,13 +78,30 @@ def send_email(to: str, subject: str, body: str,
     if thread_id:
         payload["threadId"] = thread_id
 
+    _limiter.acquire()
     return svc.users().messages().send(userId="me", body=payload).execute()
 
 def list_messages(query: str, max_results: int = 50) -> List[Dict]:
     svc = _service()
+    _limiter.acquire()
     resp = svc.users().messages().list(userId="me", q=query, maxResults=max_results).execute()
     return resp.get("messages", [])
 
+def iter_messages(query: str, page_size: int = 50) -> Iterator[Dict]:
+    """Como list_messages, pero sigue nextPageToken; pide cada página recién al consumirla."""
+    svc = _service()
+    page_token = None
+    while True:
+        _limiter.acquire()
+        resp = svc.users().messages().list(
+            userId="me", q=query, maxResults=page_size, pageToken=page_token
+        ).execute()
+        yield from resp.get("messages", [])
+        page_token = resp.get("nextPageToken")
+        if not page_token:
+            return
+
 def get_message(msg_id: str) -> Dict:
     svc = _service()
+    _limiter.acquire()
     return svc.users().messages().get(userId="me", id=msg_id, format="full").execute()
\ No newline at end of file
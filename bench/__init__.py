@@ -0,0 +1,2 @@
+"""Harness de carga sintética: corre los jobs contra dobles locales de Gmail, Supabase y OpenAI."""
+__all__ = ["fakes", "workload", "harness"]
@@ -0,0 +1,62 @@
+from __future__ import annotations
+
+import argparse
+import sys
+
+from .harness import JOBS, PROFILES, SHARDED_JOBS, bench_key, compare, load_baselines, run_once, save_baselines, summarize
+from .workload import Workload
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark sintético de los jobs (sin Gmail/Supabase/OpenAI reales)")
+    parser.add_argument("--jobs", nargs="+", choices=JOBS, default=list(JOBS))
+    parser.add_argument("--employees", type=int, nargs="+", default=[20, 100], help="N empleados (uno o varios)")
+    parser.add_argument("--replies", type=int, default=1, help="M respuestas por empleado")
+    parser.add_argument("--mailboxes", type=int, nargs="+", default=[1, 4],
+                        help="Cantidad de buzones (shards, un proceso cada uno); uno o varios")
+    parser.add_argument("--profile", choices=sorted(PROFILES), default="rapido", help="Perfil de latencia")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Probabilidad de error por round trip")
+    parser.add_argument("--repeat", type=int, default=3, help="Repeticiones por combinación")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Ruido admitido en wall/memoria")
+    parser.add_argument("--save-baseline", action="store_true", help="Guardar resultados como baseline")
+    args = parser.parse_args(argv)
+
+    baselines = load_baselines()
+    results = {}
+    regressions = 0
+
+    print(f"{'job':<16}{'carga':>9}{'buzones':>9}{'wall s':>10}{'pico KB':>11}  round trips (gmail/supabase/openai)")
+    print("-" * 89)
+    for n in args.employees:
+        w = Workload(employees=n, replies_per_employee=args.replies, seed=args.seed)
+        for job in args.jobs:
+            for mb in (args.mailboxes if job in SHARDED_JOBS else [1]):
+                runs = [run_once(job, w, args.profile, args.error_rate, mailboxes=mb) for _ in range(args.repeat)]
+                summary = summarize(runs)
+                key = bench_key(job, w, args.profile, mb, args.error_rate)
+                results[key] = summary
+
+                rt = summary["round_trips"]
+                print(
+                    f"{job:<16}{w.key:>9}{mb:>9}{summary['wall_s']:>10.3f}{summary['peak_kb']:>11.1f}  "
+                    f"{rt['gmail']}/{rt['supabase']}/{rt['openai']}"
+                    + (f"  procesados={summary['processed']}/{summary['replies']}" if "processed" in summary else "")
+                    + (f"  errores={summary['errors']}/{summary['runs']}" if summary["errors"] else "")
+                )
+                if key in baselines and not args.save_baseline:
+                    for p in compare(summary, baselines[key], args.tolerance):
+                        print(f"    REGRESIÓN {p}")
+                        regressions += 1
+
+    print("-" * 89)
+    if args.save_baseline:
+        save_baselines(results)
+        print(f"Baseline guardado ({len(results)} entradas).")
+    else:
+        print(f"Regresiones: {regressions}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
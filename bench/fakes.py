@@ -0,0 +1,411 @@
+from __future__ import annotations
+
+import base64
+import itertools
+import random
+import re
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from app.parsing.schema import ExtractedReply
+
+
+class FakeServiceError(RuntimeError):
+    """Error inyectado por un doble (simula 429/5xx del servicio real)."""
+
+
+# --------------------------
+# Latencia + inyección de errores
+# --------------------------
+
+@dataclass
+class LatencyModel:
+    """
+    Latencia por round trip: base_ms + jitter uniforme + per_kb_ms por KB de payload.
+    error_rate es la probabilidad de que la llamada falle con FakeServiceError.
+    """
+    base_ms: float = 0.0
+    jitter_ms: float = 0.0
+    per_kb_ms: float = 0.0
+    error_rate: float = 0.0
+
+    def delay(self, rng: random.Random, payload_bytes: int = 0) -> float:
+        ms = self.base_ms + rng.uniform(0, self.jitter_ms) + self.per_kb_ms * payload_bytes / 1024
+        return ms / 1000.0
+
+
+class _FakeService:
+    name = "service"
+
+    def __init__(self, latency: Optional[LatencyModel] = None, seed: int = 0):
+        self.latency = latency or LatencyModel()
+        self.seed = seed
+        self._rng = random.Random(seed)
+        self.round_trips = 0
+        self.errors = 0
+
+    def _round_trip(self, op: str, payload_bytes: int = 0) -> None:
+        self.round_trips += 1
+        wait = self.latency.delay(self._rng, payload_bytes)
+        if wait > 0:
+            time.sleep(wait)
+        if self.latency.error_rate and self._rng.random() < self.latency.error_rate:
+            self.errors += 1
+            raise FakeServiceError(f"{self.name}.{op}: error inyectado")
+
+
+# --------------------------
+# Gmail
+# --------------------------
+
+class FakeGmail(_FakeService):
+    """Buzón en memoria con la misma firma que app.services.gmail_client."""
+    name = "gmail"
+
+    def __init__(self, latency: Optional[LatencyModel] = None, seed: int = 0,
+                 address: str = "me@example.com"):
+        super().__init__(latency, seed)
+        self.address = address
+        self.sent: List[Dict] = []
+        self.inbox: Dict[str, Dict] = {}
+        self._ids = itertools.count(1)
+
+    def _new_id(self, prefix: str) -> str:
+        return f"{prefix}{next(self._ids):08x}"
+
+    def new_thread_id(self) -> str:
+        return self._new_id("t")
+
+    def send_email(self, to: str, subject: str, body: str,
+                   thread_id: Optional[str] = None,
+                   in_reply_to_rfc_message_id: Optional[str] = None) -> Dict:
+        self._round_trip("send", len(body.encode()))
+        msg = {
+            "id": self._new_id("m"),
+            "threadId": thread_id or self.new_thread_id(),
+            "labelIds": ["SENT"],
+        }
+        self.sent.append({**msg, "to": to, "subject": subject})
+        return msg
+
+    def add_reply(self, thread_id: str, sender: str, subject: str, parts: List[Tuple[str, str]]) -> str:
+        """Deja una respuesta en el inbox. parts = [(mimeType, texto), ...]."""
+        enc = [
+            {"mimeType": mime, "body": {"data": base64.urlsafe_b64encode(text.encode()).decode()}}
+            for mime, text in parts
+        ]
+        headers = [
+            {"name": "Subject", "value": subject},
+            {"name": "From", "value": sender},
+            {"name": "To", "value": self.address},
+        ]
+        if len(enc) == 1:
+            payload = {"mimeType": enc[0]["mimeType"], "headers": headers, "body": enc[0]["body"]}
+        else:
+            payload = {"mimeType": "multipart/alternative", "headers": headers, "parts": enc}
+        msg_id = self._new_id("m")
+        self.inbox[msg_id] = {"id": msg_id, "threadId": thread_id, "labelIds": ["INBOX"], "payload": payload}
+        return msg_id
+
+    def _matching(self, query: str) -> List[Dict]:
+        m = re.search(r'subject:"([^"]*)"', query)
+        phrase = m.group(1) if m else None
+        return [
+            {"id": msg["id"], "threadId": msg["threadId"]}
+            for msg in self.inbox.values()
+            if not phrase or phrase in _header(msg, "Subject")
+        ]
+
+    def list_messages(self, query: str, max_results: int = 50) -> List[Dict]:
+        self._round_trip("list")
+        return self._matching(query)[:max_results]
+
+    def iter_messages(self, query: str, page_size: int = 50) -> Iterator[Dict]:
+        """Una página (un round trip) por cada `page_size` mensajes consumidos."""
+        matches = self._matching(query)
+        for start in range(0, max(len(matches), 1), page_size):
+            self._round_trip("list")
+            yield from matches[start:start + page_size]
+
+    def get_message(self, msg_id: str) -> Dict:
+        msg = self.inbox[msg_id]
+        size = sum(len(p.get("body", {}).get("data", "")) for p in msg["payload"].get("parts") or [msg["payload"]])
+        self._round_trip("get", size)
+        return msg
+
+
+def _header(msg: Dict, name: str) -> str:
+    for h in msg.get("payload", {}).get("headers", []):
+        if h.get("name") == name:
+            return h.get("value", "")
+    return ""
+
+
+# --------------------------
+# Supabase (PostgREST)
+# --------------------------
+
+# (tabla, alias o columna embebida) -> (tabla destino, columna local, columna remota)
+_RELATIONS = {
+    ("checkins", "employee_id"): ("employees", "employee_id", "id"),
+    ("checkins", "tasks"): ("tasks", "id", "checkin_id"),
+}
+
+
+class _Response:
+    def __init__(self, data: List[Dict], count: Optional[int] = None):
+        self.data = data
+        self.count = count
+
+    def __repr__(self) -> str:
+        return f"_Response(data=<{len(self.data)} filas>, count={self.count})"
+
+
+def _split_top(cols: str) -> List[str]:
+    """Separa por comas respetando paréntesis: 'a, b:c(d,e)' -> ['a', 'b:c(d,e)']."""
+    out, depth, cur = [], 0, ""
+    for ch in cols:
+        if ch == "," and depth == 0:
+            out.append(cur.strip())
+            cur = ""
+            continue
+        depth += ch == "("
+        depth -= ch == ")"
+        cur += ch
+    if cur.strip():
+        out.append(cur.strip())
+    return out
+
+
+def _match(row: Optional[Dict], col: str, op: str, val: Any) -> bool:
+    if row is None:
+        return False
+    v = row.get(col)
+    if op == "eq":
+        return v == val
+    if op == "is_null":
+        return v is None
+    if op == "not_null":
+        return v is not None
+    raise ValueError(f"Operador no soportado: {op}")
+
+
+class _Query:
+    def __init__(self, db: "FakeSupabase", table: str):
+        self._db = db
+        self._table = table
+        self._action = "select"
+        self._cols = "*"
+        self._count: Optional[str] = None
+        self._filters: List[Tuple[str, str, Any]] = []
+        self._negate = False
+        self._order: Optional[Tuple[str, bool]] = None
+        self._limit: Optional[int] = None
+        self._payload: Any = None
+        self._on_conflict: Optional[str] = None
+
+    # --- acciones ---
+    def select(self, cols: str = "*", count: Optional[str] = None) -> "_Query":
+        self._cols, self._count = cols, count
+        return self
+
+    def insert(self, rows, returning: str = "representation") -> "_Query":
+        self._action, self._payload = "insert", rows
+        return self
+
+    def upsert(self, row, on_conflict: Optional[str] = None, returning: str = "representation") -> "_Query":
+        self._action, self._payload, self._on_conflict = "upsert", row, on_conflict
+        return self
+
+    def update(self, patch: Dict) -> "_Query":
+        self._action, self._payload = "update", patch
+        return self
+
+    def delete(self) -> "_Query":
+        self._action = "delete"
+        return self
+
+    # --- filtros ---
+    @property
+    def not_(self) -> "_Query":
+        self._negate = True
+        return self
+
+    def _add(self, col: str, op: str, val: Any) -> "_Query":
+        if self._negate:
+            op = {"is_null": "not_null", "not_null": "is_null"}.get(op, op)
+            self._negate = False
+        self._filters.append((col, op, val))
+        return self
+
+    def eq(self, col: str, val: Any) -> "_Query":
+        return self._add(col, "eq", val)
+
+    def is_(self, col: str, val: str) -> "_Query":
+        return self._add(col, "is_null" if val == "null" else "eq", val)
+
+    def order(self, col: str, desc: bool = False) -> "_Query":
+        self._order = (col, desc)
+        return self
+
+    def limit(self, n: int) -> "_Query":
+        self._limit = n
+        return self
+
+    # --- ejecución ---
+    def execute(self) -> _Response:
+        size = len(repr(self._payload)) if self._payload is not None else 0
+        self._db._round_trip(self._action, size)
+        return getattr(self, f"_exec_{self._action}")()
+
+    def _rows(self) -> List[Dict]:
+        return self._db.tables.setdefault(self._table, [])
+
+    def _where(self) -> List[Dict]:
+        # Los filtros sobre columnas embebidas ("employee.active") se aplican en _project
+        own = [f for f in self._filters if "." not in f[0]]
+        return [r for r in self._rows() if all(_match(r, c, op, v) for c, op, v in own)]
+
+    def _project(self, row: Dict) -> Dict:
+        out: Dict[str, Any] = {}
+        for col in _split_top(self._cols):
+            m = re.fullmatch(r"(?:(\w+):)?(\w+)\((.*)\)", col)
+            if not m:
+                if col == "*":
+                    out.update(row)
+                else:
+                    out[col] = row.get(col)
+                continue
+            alias, rel, sub = m.group(1) or m.group(2), m.group(2), m.group(3)
+            target, local, remote = _RELATIONS[(self._table, rel)]
+            keys = [c.strip() for c in sub.split(",")]
+            embedded_filters = [
+                (c.split(".", 1)[1], op, v) for c, op, v in self._filters if c.startswith(alias + ".")
+            ]
+            related = [
+                r for r in self._db.tables.get(target, [])
+                if r.get(remote) == row.get(local)
+                and all(_match(r, c, op, v) for c, op, v in embedded_filters)
+            ]
+            picked = [{k: r.get(k) for k in keys} if keys != ["*"] else dict(r) for r in related]
+            # Relación many-to-one -> objeto (o None si el filtro embebido no matchea)
+            out[alias] = picked if remote != "id" else (picked[0] if picked else None)
+        return out
+
+    def _exec_select(self) -> _Response:
+        rows = self._where()
+        if self._order:
+            col, desc = self._order
+            rows = sorted(rows, key=lambda r: (r.get(col) is None, r.get(col)), reverse=desc)
+        total = len(rows)
+        if self._limit is not None:
+            rows = rows[: self._limit]
+        return _Response([self._project(r) for r in rows], total if self._count else None)
+
+    def _exec_insert(self) -> _Response:
+        rows = self._payload if isinstance(self._payload, list) else [self._payload]
+        created = []
+        for r in rows:
+            r = dict(r)
+            r.setdefault("id", self._db.next_id(self._table))
+            self._rows().append(r)
+            created.append(dict(r))
+        return _Response(created)
+
+    def _exec_upsert(self) -> _Response:
+        row = dict(self._payload)
+        keys = [k.strip() for k in (self._on_conflict or "id").split(",")]
+        for existing in self._rows():
+            if all(existing.get(k) == row.get(k) for k in keys):
+                existing.update(row)
+                return _Response([dict(existing)])
+        self._rows().append(row)
+        return _Response([dict(row)])
+
+    def _exec_update(self) -> _Response:
+        rows = self._where()
+        for r in rows:
+            r.update(self._payload)
+        return _Response([dict(r) for r in rows])
+
+    def _exec_delete(self) -> _Response:
+        doomed = self._where()
+        ids = {id(r) for r in doomed}
+        self._db.tables[self._table] = [r for r in self._rows() if id(r) not in ids]
+        return _Response([dict(r) for r in doomed])
+
+
+class FakeSupabase(_FakeService):
+    """Cliente en memoria con el subconjunto del query builder que usa app.db.crud."""
+    name = "supabase"
+
+    def __init__(self, latency: Optional[LatencyModel] = None, seed: int = 0,
+                 tables: Optional[Dict[str, List[Dict]]] = None):
+        super().__init__(latency, seed)
+        self.tables: Dict[str, List[Dict]] = tables if tables is not None else {}
+        self._seq: Dict[str, itertools.count] = {}
+
+    def next_id(self, table: str) -> int:
+        return next(self._seq.setdefault(table, itertools.count(1)))
+
+    def table(self, name: str) -> _Query:
+        return _Query(self, name)
+
+
+# --------------------------
+# OpenAI (extractor_ai)
+# --------------------------
+
+_STATUS_WORDS = {
+    "completado": "completado", "terminado": "completado", "listo": "completado",
+    "pendiente": "pendiente", "por hacer": "pendiente",
+}
+
+
+class FakeOpenAI(_FakeService):
+    """
+    Doble de app.services.extractor_ai: la latencia crece con el tamaño del prompt
+    (per_kb_ms) y la extracción es determinista sobre el texto recibido.
+    """
+    name = "openai"
+
+    def __init__(self, latency: Optional[LatencyModel] = None, seed: int = 0):
+        super().__init__(latency, seed)
+        self.prompt_bytes = 0
+
+    def _call(self, op: str, message: str) -> None:
+        size = len(message.encode())
+        self.prompt_bytes += size
+        self._round_trip(op, size)
+
+    def extract_structured(self, subject: str, body_text: str, default_date: str, employee: str):
+        self._call("extract_structured", f"{subject}\n{default_date}\n{employee}\n{body_text}")
+        return ExtractedReply(employee=employee, for_date=default_date, tasks=parse_tasks(body_text))
+
+    def extract_tasks(self, tasks) -> str:
+        text = str(tasks)
+        self._call("extract_tasks", text)
+        return f"Resumen sintético ({len(text)} caracteres de entrada)."
+
+
+def parse_tasks(body: str) -> List[Dict[str, Any]]:
+    """Acepta el bloque de la plantilla (title/status/progress) o viñetas en texto libre."""
+    tasks: List[Dict[str, Any]] = []
+    for line in body.splitlines():
+        s = line.strip()
+        if s.startswith("- title:"):
+            tasks.append({"title": s.split(":", 1)[1].strip()})
+        elif tasks and ":" in s and s.split(":", 1)[0] in {"status", "progress", "next_steps", "blocker"}:
+            k, v = (x.strip() for x in s.split(":", 1))
+            if k == "progress":
+                tasks[-1][k] = int(v) if v.isdigit() and int(v) <= 100 else None
+            elif k == "status":
+                tasks[-1][k] = v if v in {"pendiente", "en_progreso", "completado"} else "en_progreso"
+            else:
+                tasks[-1][k] = v
+        elif s[:1] in {"-", "*", "•"} and len(s) > 2:
+            title = s[1:].strip()
+            status = next((st for w, st in _STATUS_WORDS.items() if w in title.lower()), "en_progreso")
+            tasks.append({"title": title, "status": status})
+    return tasks
@@ -0,0 +1,323 @@
+from __future__ import annotations
+
+import importlib
+import io
+import json
+import multiprocessing
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+import types
+from contextlib import contextmanager, redirect_stderr, redirect_stdout
+from dataclasses import asdict, dataclass, field
+from datetime import date
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from .fakes import FakeGmail, FakeOpenAI, FakeSupabase, LatencyModel
+from .workload import Workload, build
+
+BASELINES_PATH = Path(__file__).with_name("baselines.json")
+
+# Debajo de estas diferencias absolutas el cambio es ruido de la máquina, no una regresión
+WALL_FLOOR_S = 0.05
+PEAK_FLOOR_KB = 64.0
+
+# Perfiles de latencia aproximados a lo observado contra los servicios reales
+PROFILES: Dict[str, Dict[str, LatencyModel]] = {
+    "cero": {
+        "gmail": LatencyModel(),
+        "supabase": LatencyModel(),
+        "openai": LatencyModel(),
+    },
+    "realista": {
+        "gmail": LatencyModel(base_ms=120, jitter_ms=80, per_kb_ms=0.5),
+        "supabase": LatencyModel(base_ms=35, jitter_ms=25, per_kb_ms=0.2),
+        "openai": LatencyModel(base_ms=900, jitter_ms=600, per_kb_ms=15),
+    },
+    "rapido": {
+        "gmail": LatencyModel(base_ms=3, jitter_ms=2, per_kb_ms=0.05),
+        "supabase": LatencyModel(base_ms=1, jitter_ms=1, per_kb_ms=0.02),
+        "openai": LatencyModel(base_ms=8, jitter_ms=4, per_kb_ms=0.2),
+    },
+}
+
+# Módulos que se reemplazan por los dobles y módulos que deben re-importarse para verlos
+_FAKED = ("app.db.base", "app.services.gmail_client", "app.services.extractor_ai")
+_RELOAD = ("app.services", "app.jobs.sharding", "app.jobs.send_daily", "app.jobs.send_reminder",
+           "app.jobs.ingest_replies", "app.jobs.send_digest")
+
+
+# Dobles de la corrida en curso; los workers forkeados heredan la referencia
+_active: Optional[Tuple[FakeGmail, FakeSupabase, FakeOpenAI]] = None
+_parent_pid = os.getpid()
+_shard_work: Optional[Callable] = None
+
+
+@contextmanager
+def installed(gmail: FakeGmail, db: FakeSupabase, ai: FakeOpenAI, mailboxes: int = 1) -> Iterator[None]:
+    """
+    Registra los dobles en sys.modules bajo los nombres reales, de modo que los jobs
+    (que hacen `from app.services.gmail_client import send_email`) los importen sin
+    credenciales, token.json ni red. Con `mailboxes` > 1 escribe un mailboxes.json
+    temporal y los jobs corren un proceso (fork) por buzón. Los checkpoints van a un
+    directorio temporal. Restaura el estado previo al salir.
+    """
+    global _active, _parent_pid
+    import app.config as config
+
+    if mailboxes > 1 and multiprocessing.get_start_method() != "fork":
+        raise RuntimeError("--mailboxes > 1 requiere multiprocessing con fork (Linux).")
+
+    @contextmanager
+    def get_db():
+        yield db
+
+    base = types.ModuleType("app.db.base")
+    base.get_engine = lambda: db
+    base.get_db = get_db
+
+    gmail_mod = types.ModuleType("app.services.gmail_client")
+    gmail_mod.send_email = gmail.send_email
+    gmail_mod.list_messages = gmail.list_messages
+    gmail_mod.iter_messages = gmail.iter_messages
+    gmail_mod.get_message = gmail.get_message
+    gmail_mod.use_mailbox = lambda mailbox: None
+
+    ai_mod = types.ModuleType("app.services.extractor_ai")
+    ai_mod.extract_structured = ai.extract_structured
+    ai_mod.extract_tasks = ai.extract_tasks
+
+    saved = {name: sys.modules.get(name) for name in _FAKED + _RELOAD}
+    saved_paths = (config.MAILBOXES_PATH, config.CHECKPOINT_DIR)
+    for name in _RELOAD:
+        sys.modules.pop(name, None)
+    sys.modules.update({_FAKED[0]: base, _FAKED[1]: gmail_mod, _FAKED[2]: ai_mod})
+    tmp = tempfile.TemporaryDirectory()
+    config.MAILBOXES_PATH = f"{tmp.name}/mailboxes.json"
+    config.CHECKPOINT_DIR = f"{tmp.name}/checkpoints"
+    if mailboxes > 1:
+        with open(config.MAILBOXES_PATH, "w", encoding="utf-8") as f:
+            json.dump([{"address": f"buzon{i}@example.com", "token": "-"} for i in range(mailboxes)], f)
+    _active, _parent_pid = (gmail, db, ai), os.getpid()
+    try:
+        yield
+    finally:
+        _active = None
+        config.MAILBOXES_PATH, config.CHECKPOINT_DIR = saved_paths
+        tmp.cleanup()
+        for name, mod in saved.items():
+            if mod is None:
+                sys.modules.pop(name, None)
+            else:
+                sys.modules[name] = mod
+
+
+def _counted_work(fn: Callable, shard, args: tuple) -> Dict:
+    """
+    Envuelve app.jobs.sharding._work. En un worker forkeado los contadores de los dobles
+    son una copia del padre: se ponen en cero, se deja en el inbox solo lo que le llega a
+    este buzón y se re-siembra el azar por shard; al final los contadores viajan en el
+    reporte del shard (clave "bench").
+    """
+    gmail, db, ai = _active
+    child = os.getpid() != _parent_pid
+    if child:
+        owned = {c["thread_id"] for c in db.tables.get("checkins", []) if shard.owns(c["employee_id"])}
+        gmail.inbox = {k: m for k, m in gmail.inbox.items() if m["threadId"] in owned}
+        for svc in (gmail, db, ai):
+            svc.round_trips = svc.errors = 0
+            svc._rng = random.Random(f"{svc.seed}:{shard.index}")
+        tracemalloc.reset_peak()
+        start, _ = tracemalloc.get_traced_memory()
+
+    report = _shard_work(fn, shard, args)
+    if child:
+        _, peak = tracemalloc.get_traced_memory()
+        report["bench"] = {
+            "round_trips": {s.name: s.round_trips for s in (gmail, db, ai)},
+            "errors": {s.name: s.errors for s in (gmail, db, ai)},
+            "peak_kb": (peak - start) / 1024,
+        }
+    return report
+
+
+def _entrypoint(job: str, the_date: date) -> Callable[[], Optional[Dict]]:
+    global _shard_work
+    mod = importlib.import_module(f"app.jobs.{job}")
+    # sharding se re-importa en cada installed(); ProcessPoolExecutor.map lo busca por nombre.
+    # send_digest no está shardeado y no lo importa.
+    sharding = sys.modules.get("app.jobs.sharding")
+    if sharding is not None:
+        _shard_work, sharding._work = sharding._work, _counted_work
+    if job == "ingest_replies":
+        return lambda: _drain(mod, the_date, sharding.merge_reports)
+    return mod.main
+
+
+def _drain(mod, the_date: date, merge: Callable[[List[Dict]], Dict], max_rounds: int = 100) -> Dict:
+    """
+    Corre ingest_replies hasta que no queden candidatos: cada corrida procesa a lo sumo
+    MAX_PER_RUN mensajes por buzón y el checkpoint retoma desde ahí. Devuelve un reporte
+    unificado de todas las corridas (clave "rounds").
+    """
+    shards: List[Dict] = []
+    for rounds in range(1, max_rounds + 1):
+        try:
+            report = mod.run(the_date, persist=True)
+        except Exception as e:
+            if getattr(e, "report", None):
+                e.report = {**merge(shards + e.report["shards"]), "rounds": rounds}
+            raise
+        shards += report["shards"]
+        if not report.get("candidates"):
+            break
+    return {**merge(shards), "rounds": rounds}
+
+
+JOBS = ("send_daily", "send_reminder", "ingest_replies", "send_digest")
+# send_digest corre una sola vez desde el primer buzón: no tiene sentido variar los buzones
+SHARDED_JOBS = ("send_daily", "send_reminder", "ingest_replies")
+
+
+@dataclass
+class RunResult:
+    job: str
+    workload: str
+    profile: str
+    mailboxes: int
+    wall_s: float
+    peak_kb: float
+    round_trips: Dict[str, int]
+    injected_errors: Dict[str, int]
+    error: Optional[str] = None
+    scenario: Dict[str, int] = field(default_factory=dict)
+    processed: Optional[int] = None  # solo ingest_replies: mensajes procesados al vaciar el inbox
+
+
+def run_once(job: str, w: Workload, profile: str = "rapido", error_rate: float = 0.0,
+             the_date: Optional[date] = None, mailboxes: int = 1) -> RunResult:
+    """
+    Corre un job contra un estado recién sembrado y mide wall time, round trips y pico de
+    memoria. Con varios buzones suma lo medido en el proceso padre y en cada worker.
+    """
+    the_date = the_date or date.today()
+    lat = {k: LatencyModel(**{**asdict(v), "error_rate": error_rate}) for k, v in PROFILES[profile].items()}
+    gmail = FakeGmail(lat["gmail"], seed=w.seed)
+    db = FakeSupabase(lat["supabase"], seed=w.seed + 1)
+    ai = FakeOpenAI(lat["openai"], seed=w.seed + 2)
+    scenario = build(w, gmail, db, the_date)
+    services = (gmail, db, ai)
+
+    error = None
+    report = None
+    with installed(gmail, db, ai, mailboxes):
+        entry = _entrypoint(job, the_date)
+        tracemalloc.start()
+        t0 = time.perf_counter()
+        try:
+            with redirect_stdout(io.StringIO()), redirect_stderr(io.StringIO()):
+                report = entry()
+        except Exception as e:  # un error inyectado que el job no maneja aborta la corrida
+            error = repr(e)
+            # ShardError trae el reporte unificado: se conservan los contadores de los workers
+            report = getattr(e, "report", None)
+            if report:
+                error = "; ".join(r["error"] for r in report["shards"] if "error" in r)
+        wall = time.perf_counter() - t0
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    round_trips = {s.name: s.round_trips for s in services}
+    injected = {s.name: s.errors for s in services}
+    peak_kb = peak / 1024
+    for shard_report in (report or {}).get("shards", []):
+        child = shard_report.get("bench")
+        if not child:
+            continue
+        for name in round_trips:
+            round_trips[name] += child["round_trips"][name]
+            injected[name] += child["errors"][name]
+        peak_kb += child["peak_kb"]
+
+    return RunResult(
+        job=job,
+        workload=w.key,
+        profile=profile,
+        mailboxes=mailboxes,
+        wall_s=round(wall, 4),
+        peak_kb=round(peak_kb, 1),
+        round_trips=round_trips,
+        injected_errors=injected,
+        error=error,
+        scenario=scenario,
+        processed=(report or {}).get("processed") if job == "ingest_replies" else None,
+    )
+
+
+def summarize(runs: List[RunResult]) -> Dict:
+    """
+    Agrega repeticiones: mediana y mejor wall time (el mejor es el que se compara, es el
+    menos ruidoso), máximo de memoria y round trips de la primera corrida.
+    """
+    first = runs[0]
+    return {
+        "wall_s": round(statistics.median(r.wall_s for r in runs), 4),
+        "wall_best_s": min(r.wall_s for r in runs),
+        "peak_kb": max(r.peak_kb for r in runs),
+        "round_trips": first.round_trips,
+        "errors": sum(r.error is not None for r in runs),
+        "runs": len(runs),
+        **({"processed": first.processed, "replies": first.scenario["replies"]} if first.processed is not None else {}),
+    }
+
+
+def bench_key(job: str, w: Workload, profile: str, mailboxes: int = 1, error_rate: float = 0.0) -> str:
+    """Clave de baseline: todo lo que cambia el resultado (job, carga completa, perfil, buzones, errores)."""
+    return (
+        f"{job}:{w.key}:inactivos={w.inactive_ratio:g}:seed={w.seed}"
+        f":{profile}:{mailboxes}mb:err={error_rate:g}"
+    )
+
+
+# --------------------------
+# Baselines
+# --------------------------
+
+def load_baselines(path: Path = BASELINES_PATH) -> Dict[str, Dict]:
+    if not path.exists():
+        return {}
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+def save_baselines(results: Dict[str, Dict], path: Path = BASELINES_PATH) -> None:
+    merged = {**load_baselines(path), **results}
+    path.write_text(json.dumps(merged, indent=2, sort_keys=True, ensure_ascii=False) + "\n", encoding="utf-8")
+
+
+def compare(current: Dict, baseline: Dict, tolerance: float = 0.2) -> List[str]:
+    """
+    Devuelve las regresiones encontradas. Los round trips son deterministas y se comparan
+    exactos (una baja también cuenta: puede ser un job que dejó de enviar o de ingerir).
+    Wall time (el mejor de las repeticiones) y memoria cuentan solo si superan `tolerance`
+    (fracción) y además WALL_FLOOR_S / PEAK_FLOOR_KB en valor absoluto.
+    """
+    problems = []
+    for svc in sorted(set(current["round_trips"]) | set(baseline["round_trips"])):
+        before = baseline["round_trips"].get(svc, 0)
+        n = current["round_trips"].get(svc, 0)
+        if n != before:
+            problems.append(f"round trips {svc}: {before} -> {n}")
+    for metric, floor in (("wall_best_s", WALL_FLOOR_S), ("peak_kb", PEAK_FLOOR_KB)):
+        before, now = baseline.get(metric), current[metric]
+        if before and now > before * (1 + tolerance) and now - before > floor:
+            problems.append(f"{metric}: {before} -> {now} (+{(now / before - 1) * 100:.0f}%)")
+    if "processed" in baseline and current.get("processed") != baseline["processed"]:
+        problems.append(f"procesados: {baseline['processed']} -> {current.get('processed')}")
+    if current["errors"] > baseline.get("errors", 0):
+        problems.append(f"corridas con error: {baseline.get('errors', 0)} -> {current['errors']}")
+    return problems
@@ -0,0 +1,111 @@
+from __future__ import annotations
+
+import random
+from dataclasses import dataclass
+from datetime import date
+from typing import Dict, List, Tuple
+
+from app.emails.templates import render_daily
+
+from .fakes import FakeGmail, FakeSupabase, parse_tasks
+
+FORMATS = ("bloque", "libre", "multipart")
+SIZES = {"corta": (1, 0), "media": (3, 2), "larga": (8, 12)}  # (tareas, párrafos de relleno)
+
+_VERBS = ["Revisar", "Implementar", "Documentar", "Migrar", "Probar", "Desplegar", "Coordinar"]
+_OBJECTS = ["facturación", "reporte semanal", "API de pagos", "dashboard", "onboarding", "ETL", "backlog"]
+_STATUS = ["pendiente", "en_progreso", "completado"]
+_FILLER = (
+    "Además comento que la reunión con el cliente se movió y estamos esperando feedback "
+    "del equipo de datos antes de continuar con la siguiente fase del proyecto."
+)
+
+
+@dataclass
+class Workload:
+    """
+    N empleados (una fracción inactivos) con M respuestas cada uno en el hilo del día.
+    Formato y tamaño de cada respuesta se sortean con la semilla para que sea reproducible.
+    """
+    employees: int = 20
+    replies_per_employee: int = 1
+    inactive_ratio: float = 0.1
+    seed: int = 42
+
+    @property
+    def key(self) -> str:
+        return f"{self.employees}x{self.replies_per_employee}"
+
+
+def _reply_body(rng: random.Random, fmt: str, size: str, name: str, d: date) -> List[Tuple[str, str]]:
+    n_tasks, n_filler = SIZES[size]
+    tasks = [
+        (f"{rng.choice(_VERBS)} {rng.choice(_OBJECTS)}", rng.choice(_STATUS), rng.randint(0, 100))
+        for _ in range(n_tasks)
+    ]
+    if fmt == "bloque":
+        lines = [f"empleado: {name}", f"fecha: {d:%Y-%m-%d}", "tareas:"]
+        for title, status, progress in tasks:
+            lines += [
+                f"  - title: {title}",
+                f"    status: {status}",
+                f"    progress: {progress}",
+                "    next_steps: continuar",
+                "    blocker: ninguno",
+            ]
+        text = "\n".join(lines)
+    else:
+        text = "Hola, hoy avancé con:\n" + "\n".join(f"- {t} ({s}, {p}%)" for t, s, p in tasks)
+    text += "\n\n" + "\n\n".join([_FILLER] * n_filler)
+    # Siempre se cita el correo original, como hacen los clientes de correo
+    quoted = "\n".join("> " + line for line in render_daily(name, d).splitlines())
+    text = f"{text}\n\n{quoted}\n"
+    if fmt == "multipart":
+        html = "<div>" + text.replace("\n", "<br>") + "</div>"
+        return [("text/plain", text), ("text/html", html)]
+    return [("text/plain", text)]
+
+
+def build(w: Workload, gmail: FakeGmail, db: FakeSupabase, the_date: date) -> Dict[str, int]:
+    """
+    Siembra employees/checkins en la BD y las respuestas en el inbox, como si send_daily
+    ya hubiera corrido. Devuelve contadores del escenario generado.
+    """
+    rng = random.Random(w.seed)
+    employees, checkins, tasks = [], [], []
+    replies = 0
+    for i in range(1, w.employees + 1):
+        name = f"Empleado {i:04d}"
+        emp = {
+            "id": i,
+            "name": name,
+            "email": f"empleado{i:04d}@example.com",
+            "active": rng.random() >= w.inactive_ratio,
+        }
+        employees.append(emp)
+        if not emp["active"]:
+            continue
+
+        thread_id = gmail.new_thread_id()
+        checkins.append({
+            "id": thread_id,
+            "date": str(the_date),
+            "employee_id": i,
+            "thread_id": thread_id,
+            "first_message_id": thread_id,
+            "reply_received_at": None,
+        })
+        parts = []
+        for _ in range(w.replies_per_employee):
+            parts = _reply_body(rng, rng.choice(FORMATS), rng.choice(list(SIZES)), name, the_date)
+            subject = f"Re: [Seguimiento diario] {the_date:%Y-%m-%d} — {name}"
+            gmail.add_reply(thread_id, emp["email"], subject, parts)
+            replies += 1
+        # Tareas de la última respuesta ya ingeridas, para que send_digest tenga material
+        for t in parse_tasks(parts[0][1]) if parts else []:
+            tasks.append({"id": len(tasks) + 1, "checkin_id": thread_id, **t})
+
+    db.tables["employees"] = employees
+    db.tables["checkins"] = checkins
+    db.tables["tasks"] = tasks
+    return {"employees": len(employees), "active": len(checkins), "replies": replies, "tasks": len(tasks)}